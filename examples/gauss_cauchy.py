@@ -4,23 +4,71 @@ import matplotlib.pyplot as plt
 import rrg
 
 
+_SCALE = np.array(
+    [
+        [1, 0.1, 0.2],
+        [0.1, 0.8, 0.5],
+        [0.2, 0.5, 1.2],
+    ],
+    dtype=np.float32,
+)
+
+
+def _shear_numpy(samples: np.ndarray) -> np.ndarray:
+    return samples @ _SCALE
+
+
+# without numba the explicit loops would run as plain Python, so fall back to the vectorized product
+@rrg.fast(fallback=_shear_numpy)
+def _shear(samples: np.ndarray) -> np.ndarray:
+    out = np.empty(samples.shape, dtype=np.float32)
+    for n in rrg.prange(samples.shape[0]):
+        for k in range(3):
+            acc = np.float32(0)
+            for j in range(3):
+                acc += samples[n, j] * _SCALE[j, k]
+            out[n, k] = acc
+    return out
+
+
 def shear(samples: np.ndarray) -> np.ndarray:
-    scale = np.array(
-        [
-            [1, 0.1, 0.2],
-            [0.1, 0.8, 0.5],
-            [0.2, 0.5, 1.2],
-        ]
-    )
-    return np.matmul(samples, scale)
+    # float32 halves the memory traffic, which dominates for large sample counts
+    return _shear(samples.astype(np.float32, copy=False))
+
+
+# plotly becomes unresponsive in the browser beyond roughly this many points per figure
+MAX_POINTS = 50_000
+
+
+def decimate(arr: np.ndarray, max_points: int = MAX_POINTS) -> np.ndarray:
+    # keep one point per occupied cell of a uniform grid over the bulk of the cloud, plus an evenly
+    # strided sample of the outliers; the grid spans the 0.5-99.5% quantiles so heavy tails don't stretch it.
+    # nothing here is random, so regenerating a report keeps the same points
+    if len(arr) <= max_points:
+        return arr
+    n_dim = arr.shape[1]
+    lo, hi = np.quantile(arr, [0.005, 0.995], axis=0)
+    inside = np.all((arr >= lo) & (arr <= hi), axis=1)
+    core, outliers = arr[inside], arr[~inside]
+
+    # half of the budget goes to the grid, the rest to whatever outliers fit
+    bins = int((max_points // 2) ** (1 / n_dim))
+    span = np.where(hi > lo, hi - lo, 1)
+    cells = ((core - lo) / span * (bins - 1)).astype(np.int64)
+    _, keep = np.unique(np.ravel_multi_index(cells.T, (bins,) * n_dim), return_index=True)
+    core = core[np.sort(keep)]
+
+    n_outliers = min(len(outliers), max_points - len(core))
+    outliers = outliers[np.linspace(0, len(outliers) - 1, n_outliers).astype(np.int64)]
+    return np.concatenate([core, outliers])
 
 
 def plotly_2d(g: np.ndarray, c: np.ndarray, x: int, y: int) -> go.Figure:
     fig = go.Figure()
     data = {"Gauss": g, "Cauchy": c}
     for k, arr in data.items():
-        arr = arr.T
-        trace = go.Scattergl(x=arr[x], y=arr[y], marker=dict(opacity=0.5), name=k, mode="markers")
+        arr = decimate(arr[:, [x, y]]).T
+        trace = go.Scattergl(x=arr[0], y=arr[1], marker=dict(opacity=0.5), name=k, mode="markers", hoverinfo="skip")
         fig.add_trace(trace)
 
     fig = rrg.Plotly(fig, height="400px")
@@ -34,8 +82,10 @@ def plotly_3d(g: np.ndarray, c: np.ndarray) -> go.Figure:
         "Cauchy": c,
     }
     for k, arr in data.items():
-        arr = arr.T
-        trace = go.Scatter3d(x=arr[0], y=arr[1], z=arr[2], marker=dict(opacity=0.5), name=k, mode="markers")
+        arr = decimate(arr).T
+        trace = go.Scatter3d(
+            x=arr[0], y=arr[1], z=arr[2], marker=dict(opacity=0.5), name=k, mode="markers", hoverinfo="skip"
+        )
         fig.add_trace(trace)
 
     fig = rrg.Plotly(fig, height="600px")
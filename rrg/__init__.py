@@ -1 +1,2 @@
 from .report import *
+from .fast import *
@@ -0,0 +1,31 @@
+from loguru import logger
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+__all__ = [
+    "fast",
+    "prange",
+]
+
+
+# Compiles a numeric kernel with numba; cache=True keeps the machine code on disk so that regenerating a report
+# does not pay the compilation cost again. Keyword arguments override the default njit options. Without numba the
+# `fallback` implementation (typically a vectorized numpy version) is used, or else the kernel as plain Python.
+def fast(fn=None, fallback=None, **kwargs):
+    if fn is None:
+        return lambda fn: fast(fn, fallback=fallback, **kwargs)
+
+    if njit is None:
+        if fallback is not None:
+            return fallback
+        logger.warning(f"numba is not installed, {fn.__name__} will run as plain Python.")
+        return fn
+
+    options = dict(cache=True, parallel=True, fastmath=True)
+    options.update(kwargs)
+    return njit(**options)(fn)
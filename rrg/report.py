@@ -1,17 +1,24 @@
-from abc import ABC
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
 from pathlib import Path
 from shutil import rmtree
-from uuid import uuid4
+from tempfile import mkdtemp, mkstemp
+from threading import Thread
+from urllib.parse import urlsplit
+from urllib.request import urlopen
 
-from dominate import document
 from dominate import tags as D
 from dominate.util import text, raw
 from loguru import logger
-from markdown2 import markdown
+from markdown2 import Markdown
 
 try:
     from matplotlib import pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
 except ImportError:
+    FigureCanvasAgg = None
 
     class plt:
         class Figure:
@@ -55,15 +62,125 @@ def _Col12(*args, **kwargs):
     return _Col(*args, c="xl-12", **kwargs)
 
 
+def _render_col(inner_html: str, cls: str) -> str:
+    return f'<div class="col-{cls}">{inner_html}</div>'
+
+
 def _Row(*args, **kwargs):
     return D.div(*args, _class="row", **kwargs)
 
 
+_STYLESHEETS = (
+    "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.1.1/css/all.min.css",
+    "https://cdn.jsdelivr.net/npm/bootswatch@4.5.2/dist/minty/bootstrap.min.css",
+)
+_SCRIPTS = ("https://polyfill.io/v3/polyfill.min.js?features=es6",)
+_MATHJAX_SCRIPT = "https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"
+
+# Only self-contained files can be mirrored; font-awesome and MathJax load fonts relative to their own URL.
+_MIRRORABLE = (
+    "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css",
+    "https://cdn.jsdelivr.net/npm/bootswatch@4.5.2/dist/minty/bootstrap.min.css",
+)
+_MIRROR_TIMEOUT = 10
+# URLs that failed to download are not retried for the rest of the process.
+_MIRROR_FAILED = set()
+_MIRROR_CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser().joinpath("rrg")
+
+
+def _render_head_html(hrefs: dict = None):
+    hrefs = hrefs or {}
+    tags = []
+    for stylesheet in _STYLESHEETS:
+        tags.append(D.link(rel="stylesheet", href=hrefs.get(stylesheet, stylesheet)))
+    for script in _SCRIPTS:
+        tags.append(D.script(rel="script", src=hrefs.get(script, script)))
+    tags.append(
+        D.script(
+            rel="script",
+            src=hrefs.get(_MATHJAX_SCRIPT, _MATHJAX_SCRIPT),
+            id="MathJax-script",
+            _async=True,
+        )
+    )
+    return "".join(str(tag) for tag in tags)
+
+
+# The <head> contents are identical for every report, so render them once at import time.
+_HEAD_HTML = _render_head_html()
+
+
+def _mirror_asset(url: str, shared_path: Path) -> Path:
+    # Each file is downloaded once into the user cache and then copied next to any report that links it.
+    # Returns None if the download fails, in which case the report keeps linking the CDN.
+    name = urlsplit(url).path.strip("/").replace("/", "_")
+    target_path = shared_path.joinpath(name)
+    if not target_path.exists():
+        cache_path = _MIRROR_CACHE_PATH.joinpath(name)
+        if not cache_path.exists():
+            if url in _MIRROR_FAILED:
+                return None
+            logger.info(f"Downloading {url} to {str(cache_path)}")
+            try:
+                with urlopen(url, timeout=_MIRROR_TIMEOUT) as response:
+                    content = response.read()
+            except OSError as e:
+                logger.warning(f"Could not mirror {url}, linking the CDN instead: {e}")
+                _MIRROR_FAILED.add(url)
+                return None
+            cache_path.parent.mkdir(exist_ok=True, parents=True)
+            _write_bytes_atomic(cache_path, content)
+        shared_path.mkdir(exist_ok=True, parents=True)
+        _write_bytes_atomic(target_path, cache_path.read_bytes())
+    return target_path
+
+
+def _write_bytes_atomic(path: Path, content: bytes):
+    # Write next to the destination and rename into place, so a crash or a concurrent writer never leaves a
+    # truncated file behind.
+    fd, tmp_path = mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as ftmp:
+            ftmp.write(content)
+        os.chmod(tmp_path, 0o666 & ~_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _umask() -> int:
+    # The umask can only be read by setting it, so immediately restore the previous value.
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def _open_html(path: Path):
+    # Paths ending in .gz are gzip-compressed; web servers can serve them with Content-Encoding: gzip.
+    if path.suffix == ".gz":
+        return gzip.open(path, mode="wt", compresslevel=6, encoding="utf-8")
+    return open(path, mode="w", encoding="utf-8", buffering=1 << 20)
+
+
 class Report:
-    def __init__(self, title: str = "Generated report", plotly_thumbnails: bool = True, path: str = None, toc_width: int = 2):
+    def __init__(
+        self,
+        title: str = "Generated report",
+        plotly_thumbnails: bool = True,
+        path: str = None,
+        toc_width: int = 2,
+        plotly_js: str = "cdn",
+        pretty: bool = False,
+        mirror_assets: bool = False,
+    ):
         self._setup_path(path)
         self.title = title
         self._plotly_thumbnails = plotly_thumbnails
+        self._plotly_js = plotly_js
+        self._pretty = pretty
+        self._mirror_assets = mirror_assets
         self._toc_width = toc_width
 
         self._elements = []
@@ -75,7 +192,10 @@ class Report:
         self._html_path = Path(path).expanduser()
         self._dir_path = self._html_path.parent
         file_name = self._html_path.stem
+        if self._html_path.suffix == ".gz":
+            file_name = Path(file_name).stem
         self._assets_path = self._dir_path.joinpath("assets").joinpath(file_name)
+        self._asset_rel_root = Path(".").joinpath("assets").joinpath(file_name)
 
     def add_element(self, element):
         if isinstance(element, SectionHeader):
@@ -90,106 +210,154 @@ class Report:
         for el in elements:
             self.add_element(el)
 
-    def write(self, path: str = None):
+    def write(self, path: str = None, compress: bool = False):
         self._setup_path(path)
         if not hasattr(self, "_html_path"):
             raise RuntimeError("Trying to call Report.write() without specifying an output path.")
-
-        doc = document(title=self.title)
-        with doc.head:
-            for stylesheet in [
-                "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css",
-                "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.1.1/css/all.min.css",
-                "https://cdn.jsdelivr.net/npm/bootswatch@4.5.2/dist/minty/bootstrap.min.css",
-            ]:
-                D.link(rel="stylesheet", href=stylesheet)
-            for script in [
-                "https://polyfill.io/v3/polyfill.min.js?features=es6",
-            ]:
-                D.script(rel="script", src=script)
-            D.script(
-                rel="script",
-                src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js",
-                id="MathJax-script",
-                _async=True,
-            )
-
-        with doc.body:
-            with _Container():
-                with _Row():
-                    with _Col12():
-                        D.h1(self.title)
-                        Divider(strength=7)._get_html()
-
+        html_path = self._html_path
+        if compress and html_path.suffix != ".gz":
+            html_path = html_path.with_name(html_path.name + ".gz")
+
+        head_html = self._mirrored_head_html() if self._mirror_assets else _HEAD_HTML
+        head = D.head(D.title(self.title), raw(head_html))
+        header = _Container(_Row(_Col12(D.h1(self.title), Divider(strength=7)._get_html())))
+
+        # Assets are written to a fresh staging directory that is swapped into place once the report is
+        # complete, so the previous assets never need a blocking rmtree before rendering can start.
+        self._assets_path.parent.mkdir(exist_ok=True, parents=True)
+        staging_path = Path(mkdtemp(prefix=f".{self._assets_path.name}-", dir=self._assets_path.parent))
+        # mkdtemp/mkstemp create private files, so restore the permissions a plain mkdir/open would have given.
+        umask = _umask()
+        staging_path.chmod(0o777 & ~umask)
+        # The HTML is likewise streamed to a temporary file, so a failed render leaves the previous report intact.
+        fd, staging_html_path = mkstemp(prefix=f".{html_path.name}-", suffix=html_path.suffix, dir=html_path.parent)
+        os.close(fd)
+        staging_html_path = Path(staging_html_path)
+        staging_html_path.chmod(0o666 & ~umask)
+
+        # The document is streamed to disk one element at a time instead of being materialized as a
+        # single string, so only one rendered element is held in memory at once.
+        pretty = self._pretty
+        try:
+            with _open_html(staging_html_path) as fhtml:
+                fhtml.write("<!DOCTYPE html>\n<html>")
+                fhtml.write(head.render(pretty=pretty))
+                fhtml.write("<body>")
+                fhtml.write(header.render(pretty=pretty))
+                if self._toc:
+                    toc = _Col(*[D.p(D.a(name, href="#" + id_)) for name, id_ in self._toc], c=f"md-{self._toc_width}")
+                    fhtml.write('<div class="container-fluid"><div class="row">')
+                    fhtml.write(toc.render(pretty=pretty))
+                    fhtml.write(f'<div class="col-lg-{12-self._toc_width}">')
+                for element_html in self._write_elements(staging_path):
+                    fhtml.write(element_html.render(pretty=pretty))
+                if self._toc:
+                    fhtml.write("</div></div></div>")
+                fhtml.write("</body></html>")
+
+            self._swap_assets(staging_path)
+            os.replace(staging_html_path, html_path)
+        except BaseException:
+            rmtree(staging_path, ignore_errors=True)
+            staging_html_path.unlink(missing_ok=True)
+            raise
+
+        logger.info(f"Wrote report to {str(html_path)}")
+
+    def _mirrored_head_html(self):
+        # Kept outside assets/, whose subdirectories are named after reports and swapped wholesale on every write.
+        shared_path = self._dir_path.joinpath("assets_shared")
+        shared_rel_root = Path(".").joinpath("assets_shared")
+        hrefs = {}
+        for url in _MIRRORABLE:
+            mirrored_path = _mirror_asset(url, shared_path)
+            if mirrored_path is not None:
+                hrefs[url] = shared_rel_root.joinpath(mirrored_path.name)
+        return _render_head_html(hrefs)
+
+    def _swap_assets(self, staging_path: Path):
         if self._assets_path.exists():
-            rmtree(self._assets_path)
-        self._assets_path.mkdir(exist_ok=True, parents=True)
-
-        with doc.body:
-            if self._toc:
-                with _Container():
-                    with _Row():
-                        with _Col(c=f"md-{self._toc_width}"):
-                            for name, id_ in self._toc:
-                                D.p(D.a(name, href="#" + id_))
-                        with _Col(c=f"lg-{12-self._toc_width}"):
-                            self._write_elements()
-            else:
-                self._write_elements()
-
-        with open(self._html_path, mode="w") as fhtml:
-            fhtml.write(str(doc))
-
-        logger.info(f"Wrote report to {str(self._html_path)}")
-
-    def _write_elements(self):
+            # Directories can't be replaced while non-empty, so move the old assets aside and delete them in the
+            # background; the non-daemon thread keeps the interpreter alive until the deletion is done.
+            stale_path = staging_path.with_name(staging_path.name + "-stale")
+            os.replace(self._assets_path, stale_path)
+            Thread(target=rmtree, args=(stale_path,), kwargs=dict(ignore_errors=True)).start()
+        os.replace(staging_path, self._assets_path)
+
+    def _write_elements(self, assets_path: Path):
         config = dict(
-            assets_path=self._assets_path,
+            assets_path=assets_path,
+            asset_rel_root=self._asset_rel_root,
             plotly_thumbnails=self._plotly_thumbnails,
+            plotly_js=self._plotly_js,
+            pretty=self._pretty,
         )
+
+        # Saving figures is dominated by I/O and subprocess calls, so it is fanned out to a thread
+        # pool; the dominate tags themselves are only ever built on the calling thread.
+        # Assets are numbered in report order, which is unique since every write starts from an empty directory.
+        figures = {id(el): el for element in self._elements for el in element._asset_elements()}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            list(pool.map(lambda item: item[1]._write_assets(config, item[0]), enumerate(figures.values())))
+
         for element in self._elements:
-            element._get_html(config)
+            yield element._get_html(config)
+
 
+class _NCols:
+    __slots__ = ("elements", "n_cols", "col_cls")
 
-class _NCols(ABC):
-    n_cols: int = None
-    col_cls: str = None
+    n_cols: int
+    col_cls: str
 
     def __init__(self, elements):
         if not isinstance(elements, dict):
             elements = {f"({i})": el for i, el in enumerate(elements)}
         self.elements = [_resolve_element(el, tag) for tag, el in elements.items()]
 
+    def _asset_elements(self):
+        for el in self.elements:
+            if isinstance(el, _NCols):
+                yield from el._asset_elements()
+            elif hasattr(el, "_write_assets"):
+                yield el
+
     def _get_html(self, config: dict):
-        rows = []
-        for i, el in enumerate(self.elements):
-            try:
-                el_html = el._get_html(config)
-            except AttributeError:
-                el_html = str(el)
-            rows.append(_Col(el_html, c=self.col_cls))
+        cols = []
+        for el in self.elements:
+            if hasattr(el, "_get_html"):
+                el_html = el._get_html(config).render(pretty=config["pretty"])
+            else:
+                el_html = escape(str(el), quote=False)
+            cols.append(_render_col(el_html, self.col_cls))
 
-        rows = _Row(rows)
-        container = _Container(rows)
-        return container
+        return raw(f'<div class="container-fluid"><div class="row">{"".join(cols)}</div></div>')
 
 
 class Cols1(_NCols):
+    __slots__ = ()
+
     n_cols = 1
     col_cls = "xl-12"
 
 
 class Cols3(_NCols):
+    __slots__ = ()
+
     n_cols = 3
     col_cls = "lg-4"
 
 
 class Cols2(_NCols):
+    __slots__ = ()
+
     n_cols = 2
     col_cls = "lg-6"
 
 
 class Cols(_NCols):
+    __slots__ = ()
+
     def __init__(self, elements):
         N = self.n_cols = len(elements)
 
@@ -230,19 +398,17 @@ class SectionHeader:
 
 
 def _resolve_element(el, tag):
-    if isinstance(el, D.html_tag):
-        return HTMLElement(el)
-
-    elif isinstance(el, str):
-        return TextElement(el)
-
-    elif isinstance(el, plt.Figure):
-        return MatplotlibElement(el, tag)
+    resolver = _RESOLVERS.get(type(el))
+    if resolver is not None:
+        return resolver(el, tag)
 
-    elif isinstance(el, go.Figure):
-        return PlotlyElement(el, tag)
+    for cls, resolver in tuple(_RESOLVERS.items()):
+        if isinstance(el, cls):
+            # Remember the concrete subclass (e.g. a specific dominate tag) so the next lookup is a dict hit.
+            _RESOLVERS[type(el)] = resolver
+            return resolver(el, tag)
 
-    elif isinstance(el, BaseElement) and hasattr(el, "tag"):
+    if isinstance(el, BaseElement) and hasattr(el, "tag"):
         el.tag = tag
         return el
 
@@ -250,11 +416,21 @@ def _resolve_element(el, tag):
         return el
 
 
+def _caption_html(tag: str, href: Path) -> str:
+    tag = escape(str(tag)) if tag is not None else ""
+    return (
+        f'<p class="text-center">{tag}<a href="{escape(str(href))}" target="_blank">'
+        '<i class="fa-solid fa-up-right-from-square text-center"></i></a></p>'
+    )
+
+
 class BaseElement:
-    ...
+    __slots__ = ()
 
 
 class TextElement(BaseElement):
+    __slots__ = ("content",)
+
     def __init__(self, el):
         self.content = el
 
@@ -265,6 +441,8 @@ class TextElement(BaseElement):
 
 
 class HTMLElement(BaseElement):
+    __slots__ = ("content",)
+
     def __init__(self, el):
         self.content = str(el)
 
@@ -272,23 +450,40 @@ class HTMLElement(BaseElement):
         return raw(self.content)
 
 
+# Building a markdown2 parser compiles its regex tables, so a single instance is shared by all elements.
+_MARKDOWN = Markdown()
+
+
 class MarkdownElement(HTMLElement):
+    __slots__ = ()
+
     def __init__(self, el):
-        self.content = markdown(el)
+        self.content = _MARKDOWN.convert(el)
 
 
 class MatplotlibElement(BaseElement):
-    def __init__(self, el: plt.Figure, tag: str = None, height=None, width="100%"):
+    __slots__ = ("content", "tag", "height", "width", "dpi", "_asset_name")
+
+    def __init__(self, el: plt.Figure, tag: str = None, height=None, width="100%", dpi=None):
         self.content = el
         self.tag = tag
         self.height = height
         self.width = width
+        self.dpi = dpi
+        self._asset_name = None
+
+    def _write_assets(self, config: dict, index: int):
+        self._asset_name = f"{index:04d}.png"
+        # Report assets are transient, so trade a slightly larger PNG for much cheaper zlib compression.
+        self.content.savefig(
+            config["assets_path"].joinpath(self._asset_name),
+            dpi=self.dpi,
+            bbox_inches=None,
+            pil_kwargs={"compress_level": 1, "optimize": False},
+        )
 
     def _get_html(self, config: dict):
-        tag = uuid4().hex + ".png"
-        target_path = config["assets_path"].joinpath(tag)
-        rel_path = Path(str(target_path).replace(str(target_path.parents[2]), "."))
-        self.content.savefig(target_path)
+        rel_path = config["asset_rel_root"].joinpath(self._asset_name)
 
         kwarg = {}
         if self.height is not None:
@@ -300,10 +495,7 @@ class MatplotlibElement(BaseElement):
             target="_blank",
             **kwarg,
         )
-        tag = D.p(
-            [self.tag, D.a(D.i(_class="fa-solid fa-up-right-from-square text-center"), href=rel_path, target="_blank")],
-            _class="text-center",
-        )
+        tag = raw(_caption_html(self.tag, rel_path))
         return D.div(
             [
                 img,
@@ -312,30 +504,127 @@ class MatplotlibElement(BaseElement):
         )
 
 
+_FAST_THUMBNAIL_TRACES = {"scatter", "scattergl", "bar"}
+
+
+def _fast_plotly_thumbnail_supports(trace) -> bool:
+    # Only single-axes figures are redrawn; subplots and horizontal bars are left to kaleido.
+    return (
+        trace.type in _FAST_THUMBNAIL_TRACES
+        and trace.y is not None
+        # plotly>=6 figures rebuilt from JSON keep arrays base64-encoded as {"dtype": ..., "bdata": ...} dicts
+        and not isinstance(trace.x, dict)
+        and not isinstance(trace.y, dict)
+        and trace.xaxis in (None, "x")
+        and trace.yaxis in (None, "y")
+        and not (trace.type == "bar" and trace.orientation == "h")
+    )
+
+
+# Approximates a simple plotly figure with matplotlib, avoiding kaleido's headless browser. Returns False without
+# writing anything if matplotlib is unavailable or the figure uses anything the approximation can't reproduce.
+def _fast_plotly_thumbnail(fig: go.Figure, path: Path) -> bool:
+    if FigureCanvasAgg is None:
+        return False
+    if not all(_fast_plotly_thumbnail_supports(trace) for trace in fig.data):
+        return False
+    if fig.layout.xaxis.type not in (None, "-", "linear") or fig.layout.yaxis.type not in (None, "-", "linear"):
+        return False
+
+    width = fig.layout.width or 700
+    height = fig.layout.height or 450
+    # Use the object-oriented API so that no pyplot state is touched from worker threads.
+    thumbnail = plt.Figure(figsize=(width / 100, height / 100), dpi=100)
+    FigureCanvasAgg(thumbnail)
+    ax = thumbnail.add_subplot()
+    traces = [trace for trace in fig.data if trace.visible in (None, True)]
+    for trace in traces:
+        y = list(trace.y)
+        x = list(trace.x) if trace.x is not None else list(range(len(y)))
+        if trace.type == "bar":
+            ax.bar(x, y, label=trace.name)
+            continue
+        # plotly draws short scatter traces with markers and lines, and long ones with lines only.
+        mode = trace.mode or ("lines+markers" if len(y) < 20 else "lines")
+        if "lines" in mode:
+            ax.plot(x, y, label=trace.name)
+        if "markers" in mode:
+            ax.scatter(x, y, label=None if "lines" in mode else trace.name)
+
+    if any(trace.name for trace in traces):
+        ax.legend()
+    if fig.layout.title.text:
+        ax.set_title(fig.layout.title.text)
+    for axis, set_label, set_lim, invert in [
+        (fig.layout.xaxis, ax.set_xlabel, ax.set_xlim, ax.invert_xaxis),
+        (fig.layout.yaxis, ax.set_ylabel, ax.set_ylim, ax.invert_yaxis),
+    ]:
+        if axis.title.text:
+            set_label(axis.title.text)
+        if axis.range is not None:
+            set_lim(*axis.range)
+        elif axis.autorange == "reversed":
+            invert()
+    pil_kwargs = {"compress_level": 1, "optimize": False} if path.suffix == ".png" else None
+    thumbnail.savefig(path, pil_kwargs=pil_kwargs)
+    return True
+
+
 class PlotlyElement(BaseElement):
-    def __init__(self, el: go.Figure, tag: str = None, height=None, width="100%"):
+    __slots__ = ("content", "tag", "height", "width", "thumbnail", "thumbnail_format", "_asset_name")
+
+    def __init__(
+        self,
+        el: go.Figure,
+        tag: str = None,
+        height=None,
+        width="100%",
+        thumbnail: bool = None,
+        thumbnail_format: str = "png",
+    ):
         self.content = el
         self.tag = tag
         self.height = height
         self.width = width
+        # None defers to the report-wide plotly_thumbnails setting.
+        self.thumbnail = thumbnail
+        self.thumbnail_format = thumbnail_format
+        self._asset_name = None
+
+    def _use_thumbnail(self, config: dict) -> bool:
+        if self.thumbnail is None:
+            return config["plotly_thumbnails"]
+        return self.thumbnail
+
+    def _write_assets(self, config: dict, index: int):
+        self._asset_name = f"{index:04d}.html"
+        html_target_path = config["assets_path"].joinpath(self._asset_name)
+        # Never inline the plotly.js bundle: "cdn" links it, "directory" shares one copy per assets dir.
+        self.content.write_html(
+            html_target_path,
+            include_plotlyjs=config["plotly_js"],
+            full_html=True,
+            include_mathjax=False,
+            auto_play=False,
+        )
+
+        if self._use_thumbnail(config):
+            thumbnail_target_path = html_target_path.with_suffix("." + self.thumbnail_format)
+            if not _fast_plotly_thumbnail(self.content, thumbnail_target_path):
+                self.content.write_image(thumbnail_target_path, format=self.thumbnail_format)
 
     def _get_html(self, config: dict):
-        tag = uuid4().hex + ".html"
-        html_target_path = config["assets_path"].joinpath(tag)
-        html_rel_path = Path("./" + str(html_target_path).replace(str(html_target_path.parents[2]), "."))
-        self.content.write_html(html_target_path, include_plotlyjs="cdn", auto_play=False)
+        html_rel_path = config["asset_rel_root"].joinpath(self._asset_name)
 
-        if config["plotly_thumbnails"]:
-            png_target_path = Path(str(html_target_path).replace(".html", ".png"))
-            png_rel_path = Path("./" + str(png_target_path).replace(str(png_target_path.parents[2]), "."))
-            self.content.write_image(png_target_path)
+        if self._use_thumbnail(config):
+            thumbnail_rel_path = html_rel_path.with_suffix("." + self.thumbnail_format)
 
             kwarg = {}
             if self.height is not None:
                 kwarg["height"] = self.height
 
             img = D.a(
-                D.img(src=png_rel_path, width=self.width, _class="text-center", **kwarg),
+                D.img(src=thumbnail_rel_path, width=self.width, _class="text-center", **kwarg),
                 href=html_rel_path,
                 target="_blank",
             )
@@ -350,14 +639,19 @@ class PlotlyElement(BaseElement):
                 kwarg["height"] = self.height
             img = D.iframe(src=html_rel_path, width=self.width, _class="text-center", **kwarg)
 
-        tag = D.p(
-            [self.tag, D.a(D.i(_class="fa-solid fa-up-right-from-square text-center"), href=html_rel_path, target="_blank")],
-            _class="text-center",
-        )
+        tag = raw(_caption_html(self.tag, html_rel_path))
 
         return D.div([img, tag])
 
 
+_RESOLVERS = {
+    D.html_tag: lambda el, tag: HTMLElement(el),
+    str: lambda el, tag: TextElement(el),
+    plt.Figure: MatplotlibElement,
+    go.Figure: PlotlyElement,
+}
+
+
 Text = TextElement
 HTML = HTMLElement
 Markdown = MarkdownElement